@@ -0,0 +1,145 @@
+"""Compare the legacy base64/JSON-file result handoff with the framed binary transport.
+
+Each mode runs in its own consumer process so peak RSS is measured cleanly.
+The producer generates N noisy screenshots (incompressible, worst case for
+PNG), encodes them with Qt and hands them over; the consumer ends up with the
+PNG files on disk and the Image objects interactive_feedback would return.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_transport.py --count 10 --size 1600
+"""
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def produce(mode: str, count: int, size: int, output_file: str | None):
+    import feedback_ui
+    feedback_ui._init_app()
+    pixmaps = feedback_ui._noise_pixmaps(count, size)
+    if mode == "legacy":
+        result = {
+            "interactive_feedback": "bench",
+            "images": [feedback_ui.FeedbackUI._pixmap_to_base64(p) for p in pixmaps],
+        }
+        with open(output_file, "w") as f:
+            json.dump(result, f)
+        return
+
+    class _Done:
+        feedback_result = feedback_ui.FeedbackResult(interactive_feedback="bench", images=[])
+        submitted_screenshots = pixmaps
+        # No eager encoding here: _result_payload encodes every pixmap itself.
+        submitted_encode_jobs: list = []
+        submitted_at = time.time()
+
+    feedback_ui._frame_out = sys.stdout.buffer
+    os.environ.setdefault("MCP_FEEDBACK_IMAGE_FORMAT", "png")  # same encoding as the legacy path
+    feedback_ui._stream_result(*feedback_ui._result_payload(_Done))
+
+
+async def _consume_framed(count: int, size: int) -> list[str]:
+    import server
+    from fastmcp.utilities.types import Image
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--produce", "framed",
+        "--count", str(count), "--size", str(size),
+        stdout=asyncio.subprocess.PIPE, stdin=asyncio.subprocess.DEVNULL,
+    )
+    worker = server._UIWorker(process)
+    result = await worker.read_result()
+    await process.wait()
+    [Image(path=p) for p in result["images"]]
+    return result["images"]
+
+
+def _consume_legacy(count: int, size: int) -> list[str]:
+    import uuid
+    import server  # noqa: F401 - keep the import footprint identical to the framed run
+    from fastmcp.utilities.types import Image
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        output_file = tmp.name
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--produce", "legacy",
+         "--count", str(count), "--size", str(size), "--output-file", output_file],
+        check=True,
+    )
+    with open(output_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    os.unlink(output_file)
+    decoded_images = [base64.b64decode(img) for img in data["images"]]
+    run_id = uuid.uuid4().hex[:8]
+    paths = []
+    for i, img_bytes in enumerate(decoded_images):
+        path = os.path.join(tempfile.gettempdir(), f"mcp_feedback_{run_id}_{i}.png")
+        with open(path, "wb") as f:
+            f.write(img_bytes)
+        paths.append(path)
+    [Image(data=img_bytes, format="png") for img_bytes in decoded_images]
+    return paths
+
+
+def consume(mode: str, count: int, size: int) -> dict:
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        paths = _consume_legacy(count, size)
+    else:
+        paths = asyncio.run(_consume_framed(count, size))
+    elapsed = time.perf_counter() - t0
+    total = sum(os.path.getsize(p) for p in paths)
+    for p in paths:
+        os.unlink(p)
+    return {
+        "mode": mode,
+        "images": len(paths),
+        "png_bytes": total,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--size", type=int, default=1600, help="Image width in px (height is 10/16 of it)")
+    parser.add_argument("--produce", choices=("legacy", "framed"), help=argparse.SUPPRESS)
+    parser.add_argument("--consume", choices=("legacy", "framed"), help=argparse.SUPPRESS)
+    parser.add_argument("--output-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.produce:
+        produce(args.produce, args.count, args.size, args.output_file)
+    elif args.consume:
+        print(json.dumps(consume(args.consume, args.count, args.size)))
+    else:
+        env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+        results = []
+        for mode in ("legacy", "framed"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--consume", mode,
+                 "--count", str(args.count), "--size", str(args.size)],
+                check=True, capture_output=True, text=True, env=env,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,39 @@
 import os
 import sys
 import json
+import math
 import locale
+import time
+import struct
+import random
 import argparse
 import platform
 import threading
 import subprocess
 import urllib.request
-from typing import TypedDict
+from typing import TypedDict, NotRequired
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QCheckBox, QTextEdit, QGroupBox,
     QFrame, QScrollArea, QFileDialog, QSizePolicy, QDialog, QMenu, QComboBox,
-    QSpinBox,
+    QSpinBox, QListView, QAbstractItemView, QStyledItemDelegate, QStyle,
+)
+from PySide6.QtCore import (
+    Qt, Signal, QObject, QEvent, qVersion, QTimer, QSettings, QByteArray, QBuffer, QIODevice, QUrl,
+    QRunnable, QThreadPool, QAbstractListModel, QModelIndex, QSize, QRect,
+)
+from PySide6.QtGui import (
+    QIcon, QKeyEvent, QPalette, QColor, QPixmap, QImage, QImageReader, QImageWriter, QImageIOHandler, QAction,
+    QDesktopServices, QPainter, QPen,
 )
-from PySide6.QtCore import Qt, Signal, QTimer, QSettings, QByteArray, QBuffer, QIODevice, QUrl
-from PySide6.QtGui import QIcon, QKeyEvent, QPalette, QColor, QPixmap, QImage, QAction, QDesktopServices
 
 class FeedbackResult(TypedDict):
     interactive_feedback: str
     images: list[str]
+    answers: NotRequired[list[dict]]
+    # Single-question windows: what the user chose and typed, without the toggle hints.
+    answer: NotRequired[dict]
 
 
 def _read_local_version() -> str:
@@ -95,7 +108,11 @@ _I18N = {
         "settings_tip": "设置",
         "send": "发送反馈",
         "screenshots_count": "{n} 张截图已附加",
+        "screenshots_tokens": "约 {tokens} 图片 token",
+        "screenshots_scaled": "（已按 {budget} token 预算缩小）",
         "preview_tip": "点击预览原图",
+        "image_loading": "加载中…",
+        "image_too_large": "已跳过 {files}：图片过大，完整解码需超过 {mb} MB",
         "preview_title": "图片预览",
         "submit_directly": "── 直接提交 ──",
         "select_images": "选择图片",
@@ -137,6 +154,8 @@ _I18N = {
         "auto_submit_enable": "启用自动提交（突破1小时限制）",
         "auto_submit_seconds": "倒计时（秒）：",
         "auto_submit_countdown": "⏱ 自动提交倒计时：{m}:{s}",
+        "question_n": "问题 {i}/{n}",
+        "answer_placeholder": "在此输入回答（Ctrl+Enter 提交全部）",
     },
     "en": {
         "message": "Message:",
@@ -158,7 +177,11 @@ _I18N = {
         "settings_tip": "Settings",
         "send": "&Send Feedback",
         "screenshots_count": "{n} screenshot(s) attached",
+        "screenshots_tokens": "~{tokens} image tokens",
+        "screenshots_scaled": "(downscaled to fit the {budget}-token budget)",
         "preview_tip": "Click to preview full image",
+        "image_loading": "Loading…",
+        "image_too_large": "Skipped {files}: too large to decode within {mb} MB",
         "preview_title": "Image Preview",
         "submit_directly": "── Submit directly ──",
         "select_images": "Select Images",
@@ -200,6 +223,8 @@ _I18N = {
         "auto_submit_enable": "Enable auto-submit (bypass 1h limit)",
         "auto_submit_seconds": "Countdown (sec):",
         "auto_submit_countdown": "⏱ Auto-submit in: {m}:{s}",
+        "question_n": "Question {i}/{n}",
+        "answer_placeholder": "Your answer (Ctrl+Enter submits all)",
     },
 }
 
@@ -240,10 +265,15 @@ def get_dark_mode_palette(app: QApplication):
 
 class FeedbackTextEdit(QTextEdit):
     image_pasted = Signal(QImage)
+    focused = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.focused.emit()
+
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key_Return and event.modifiers() == Qt.ControlModifier:
             parent = self.parent()
@@ -598,54 +628,257 @@ class ImagePreviewDialog(QDialog):
         self.resize(scaled.width() + 2, scaled.height() + 2)
 
 
-class ScreenshotThumbnail(QWidget):
-    removed = Signal(int)
+_MAX_SCREENSHOT_EDGE = 1600
+_MAX_CONCURRENT_DECODES = 2
+_DECODE_BYTES_PER_PIXEL = 4
+_QT_ALLOCATION_LIMIT_MB = 256  # QImageReader's default
+_THUMB_SIZE = (150, 100)
+_THUMB_ITEM = QSize(166, 130)
+_THUMB_REMOVE_HEIGHT = 22
+
+
+def _decode_budget_mb() -> int:
+    """MCP_FEEDBACK_IMAGE_DECODE_MAX_MB: largest full-resolution decode allowed for an attached file."""
+    try:
+        return max(1, int(os.environ.get("MCP_FEEDBACK_IMAGE_DECODE_MAX_MB", 256)))
+    except ValueError:
+        return 256
+
+
+def _read_image_file(path: str) -> tuple[QImage | None, bool]:
+    """Decode an image file at no more than _MAX_SCREENSHOT_EDGE on its long side.
+
+    The header is read first. Formats whose decoder can scale (JPEG) are
+    decoded straight at the target size; others are decoded in full only if
+    that fits the decode budget. Returns (image or None, rejected for size).
+    """
+    budget = _decode_budget_mb() * 1024 * 1024
+    # Qt refuses allocations above its own limit, which would otherwise cap a
+    # larger budget. It is never lowered below the default: scaled decoders
+    # (libjpeg) allocate an intermediate image larger than the target, and the
+    # budget for full decodes is enforced from the header below.
+    limit_mb = max(_decode_budget_mb(), _QT_ALLOCATION_LIMIT_MB)
+    QImageReader.setAllocationLimit(limit_mb)
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    # Deep formats (e.g. 16-bit PNG) decode to more than 4 bytes per pixel.
+    pixel_bytes = max(_DECODE_BYTES_PER_PIXEL, QImage.toPixelFormat(reader.imageFormat()).bitsPerPixel() // 8)
+    if size.isValid():
+        width, height = size.width(), size.height()
+        scale = _MAX_SCREENSHOT_EDGE / max(width, height, 1)
+        if scale < 1 and reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize):
+            reader.setScaledSize(QSize(max(1, round(width * scale)), max(1, round(height * scale))))
+        elif width * height * pixel_bytes > budget:
+            return None, True
+    image = reader.read()
+    if not image.isNull():
+        return image, False
+    # Qt reports an over-limit allocation as a plain read failure. Judge by
+    # the full size, since that is what a scaled decode may still allocate.
+    return None, size.isValid() and size.width() * size.height() * pixel_bytes > limit_mb * 1024 * 1024
+
+
+class _IngestSignals(QObject):
+    finished = Signal(object)
+
+
+class _IngestJob(QRunnable):
+    """Decode (for a file path) and downscale one incoming image off the GUI thread.
+
+    Works on QImage only, which unlike QPixmap is safe outside the GUI
+    thread. `finished` is delivered on the GUI thread once `image` is set
+    (None if the file could not be read, with `too_large` set if it was
+    refused by the decode budget).
+    """
+
+    def __init__(self, source: str | QImage):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.source = source
+        self.name = os.path.basename(source) if isinstance(source, str) else ""
+        self.image: QImage | None = None
+        self.thumbnail: QImage | None = None
+        self.too_large = False
+        self.signals = _IngestSignals()
+        self._claim = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def run(self):
+        # The pool and wait() may both get here; the first one decodes.
+        if not self._claim.acquire(blocking=False):
+            return
+        try:
+            if isinstance(self.source, str):
+                image, self.too_large = _read_image_file(self.source)
+            else:
+                image = self.source
+            if image is not None and max(image.width(), image.height()) > _MAX_SCREENSHOT_EDGE:
+                image = image.scaled(
+                    _MAX_SCREENSHOT_EDGE, _MAX_SCREENSHOT_EDGE, Qt.KeepAspectRatio, Qt.SmoothTransformation,
+                )
+            if image is not None and not image.isNull():
+                self.image = image
+                self.thumbnail = image.scaled(*_THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        finally:
+            self.source = None
+            self._done.set()
+            try:
+                self.signals.finished.emit(self)
+            except RuntimeError:
+                pass  # the window went away while this image was decoding
+
+    def wait(self, pool: QThreadPool) -> QImage | None:
+        """Block until decoded, decoding on this thread if the job has not started yet."""
+        if pool.tryTake(self):
+            self.run()
+        self._done.wait()
+        return self.image
+
+
+class _ThumbnailModel(QAbstractListModel):
+    """Screenshots in the thumbnail strip, followed by one placeholder row per import in progress.
 
-    def __init__(self, pixmap: QPixmap, index: int, parent=None):
+    Rows are inserted and removed individually, and each thumbnail is scaled
+    once: by the import job, or the first time the view asks to paint it.
+    """
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.index = index
-        self._full_pixmap = pixmap
+        self._pixmaps: list[QPixmap] = []
+        self._thumbs: list[QPixmap | None] = []
+        self._pending = 0
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._pixmaps) + self._pending
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        row = index.row()
+        if row >= len(self._pixmaps):
+            return _t("image_loading") if role == Qt.DisplayRole else None
+        if role == Qt.DecorationRole:
+            if self._thumbs[row] is None:
+                self._thumbs[row] = self._pixmaps[row].scaled(*_THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            return self._thumbs[row]
+        if role == Qt.ToolTipRole:
+            return _t("preview_tip")
+        return None
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(4, 4, 4, 4)
-        layout.setSpacing(2)
-
-        thumb_label = QLabel()
-        scaled = pixmap.scaled(150, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        thumb_label.setPixmap(scaled)
-        thumb_label.setAlignment(Qt.AlignCenter)
-        thumb_label.setCursor(Qt.PointingHandCursor)
-        thumb_label.setToolTip(_t("preview_tip"))
-        thumb_label.setStyleSheet("border: 1px solid #555; border-radius: 4px; padding: 2px;")
-        thumb_label.mousePressEvent = lambda _: self._preview()
-        layout.addWidget(thumb_label)
-
-        remove_btn = QPushButton("✕")
-        remove_btn.setFixedHeight(22)
-        remove_btn.setStyleSheet(
-            "QPushButton { color: #ff6666; background: transparent; "
-            "border: 1px solid #555; border-radius: 3px; font-size: 11px; }"
-            "QPushButton:hover { background: rgba(255,102,102,0.25); }"
-        )
-        remove_btn.clicked.connect(lambda: self.removed.emit(self.index))
-        layout.addWidget(remove_btn)
+    def pixmap(self, row: int) -> QPixmap:
+        return self._pixmaps[row]
+
+    def append(self, pixmaps: list[QPixmap], thumbs: list[QPixmap | None]):
+        if not pixmaps:
+            return
+        first = len(self._pixmaps)
+        self.beginInsertRows(QModelIndex(), first, first + len(pixmaps) - 1)
+        self._pixmaps += pixmaps
+        self._thumbs += thumbs
+        self.endInsertRows()
+
+    def remove(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._pixmaps[row], self._thumbs[row]
+        self.endRemoveRows()
+
+    def set_pending(self, count: int):
+        first = len(self._pixmaps)
+        if count > self._pending:
+            self.beginInsertRows(QModelIndex(), first + self._pending, first + count - 1)
+            self._pending = count
+            self.endInsertRows()
+        elif count < self._pending:
+            self.beginRemoveRows(QModelIndex(), first + count, first + self._pending - 1)
+            self._pending = count
+            self.endRemoveRows()
+
+
+class _ThumbnailDelegate(QStyledItemDelegate):
+    """Paints a thumbnail with its ✕ button; clicks preview or remove the screenshot."""
+    preview_requested = Signal(int)
+    remove_requested = Signal(int)
 
-        self.setFixedWidth(166)
+    @staticmethod
+    def _rects(rect: QRect) -> tuple[QRect, QRect]:
+        inner = rect.adjusted(4, 4, -4, -4)
+        image = inner.adjusted(0, 0, 0, -(_THUMB_REMOVE_HEIGHT + 2))
+        remove = QRect(inner.left(), inner.bottom() - _THUMB_REMOVE_HEIGHT + 1, inner.width(), _THUMB_REMOVE_HEIGHT)
+        return image, remove
+
+    def sizeHint(self, option, index) -> QSize:
+        return _THUMB_ITEM
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        image_rect, remove_rect = self._rects(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        thumb = index.data(Qt.DecorationRole)
+        if thumb is None:
+            painter.setPen(QPen(QColor("#555"), 1, Qt.DashLine))
+            painter.drawRoundedRect(option.rect.adjusted(4, 4, -5, -5), 4, 4)
+            painter.setPen(QColor("#888"))
+            painter.drawText(option.rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+            painter.restore()
+            return
+        painter.setPen(QColor("#555"))
+        painter.drawRoundedRect(image_rect.adjusted(0, 0, -1, -1), 4, 4)
+        target = QRect(0, 0, thumb.width(), thumb.height())
+        target.moveCenter(image_rect.center())
+        painter.drawPixmap(target, thumb)
+        if option.state & QStyle.State_MouseOver:
+            painter.fillRect(remove_rect, QColor(255, 102, 102, 64))
+        painter.drawRoundedRect(remove_rect.adjusted(0, 0, -1, -1), 3, 3)
+        painter.setPen(QColor("#ff6666"))
+        painter.drawText(remove_rect, Qt.AlignCenter, "✕")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if index.data(Qt.DecorationRole) is None:
+                return True
+            image_rect, remove_rect = self._rects(option.rect)
+            if remove_rect.contains(event.position().toPoint()):
+                self.remove_requested.emit(index.row())
+            elif image_rect.contains(event.position().toPoint()):
+                self.preview_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
 
-    def _preview(self):
-        dialog = ImagePreviewDialog(self._full_pixmap, self)
-        dialog.exec()
 
 class FeedbackUI(QMainWindow):
     _update_available = Signal(str)
+    closed = Signal()
+    first_painted = Signal()
+    # {"focused": bool, "draft_chars": int, "screenshots": int, "last_input": float}
+    state_changed = Signal(dict)
 
-    def __init__(self, prompt: str, predefined_options: list[str] | None = None, window_id: str = "0"):
+    def __init__(self, prompt: str, predefined_options: list[str] | None = None, window_id: str = "0",
+                 questions: list[dict] | None = None):
         super().__init__()
         self.setAcceptDrops(True)
         self.prompt = prompt
         self.predefined_options = predefined_options or []
+        # Batch mode: [{"message": str, "predefined_options": [str]}], one section each.
+        self.questions = questions or []
         self.feedback_result = None
         self.screenshots: list[QPixmap] = []
+        # One background encode per screenshot, started on attach so Submit finds the bytes ready.
+        self._encode_jobs: list[_EncodeJob] = []
+        # Pasted, dropped and browsed images are decoded and scaled here, in
+        # arrival order, and shown as placeholders until they are done.
+        self._ingesting: list[_IngestJob] = []
+        self._ingest_notice = ""
+        self._ingest_pool = QThreadPool(self)
+        self._ingest_pool.setMaxThreadCount(_MAX_CONCURRENT_DECODES)
+        self.submitted_screenshots: list[QPixmap] = []
+        self.submitted_encode_jobs: list[_EncodeJob] = []
+        # Wall-clock time of a real submit; stays None when the countdown closes the window.
+        self.submitted_at: float | None = None
+        self._painted = False
         self._latest_version: str | None = None
         self._window_id = window_id
 
@@ -677,8 +910,45 @@ class FeedbackUI(QMainWindow):
         self.settings.endGroup()
 
         self._ensure_visible_on_screen()
+        self._last_input = 0.0
+        # Typing is reported at most once a second.
+        self._state_timer = QTimer(self)
+        self._state_timer.setSingleShot(True)
+        self._state_timer.setInterval(1000)
+        self._state_timer.timeout.connect(self._emit_state)
         self._create_ui()
 
+        for edit in self.findChildren(FeedbackTextEdit):
+            edit.textChanged.connect(self._note_input)
+        question_checkboxes = [c for checkboxes, _ in getattr(self, "_question_widgets", []) for c in checkboxes]
+        for checkbox in self.option_checkboxes + question_checkboxes:
+            checkbox.toggled.connect(self._note_input)
+
+    # --- Activity reporting ---
+
+    def _note_input(self, *_):
+        self._last_input = time.time()
+        if not self._state_timer.isActive():
+            self._state_timer.start()
+
+    def _draft_chars(self) -> int:
+        if self.questions:
+            return sum(len(answer.toPlainText().strip()) for _, answer in self._question_widgets)
+        return len(self.feedback_text.toPlainText().strip())
+
+    def _emit_state(self):
+        self.state_changed.emit({
+            "focused": self.isActiveWindow(),
+            "draft_chars": self._draft_chars(),
+            "screenshots": len(self.screenshots),
+            "last_input": self._last_input,
+        })
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.ActivationChange and self.isVisible():
+            self._emit_state()
+
     def _ensure_visible_on_screen(self):
         """Ensure the window is within visible screen bounds and not minimized."""
         available = QApplication.primaryScreen().availableGeometry()
@@ -729,65 +999,10 @@ class FeedbackUI(QMainWindow):
         self.feedback_group = QGroupBox()
         feedback_layout = QVBoxLayout(self.feedback_group)
 
-        prompt_header = QHBoxLayout()
-        prompt_title = QLabel(_t("message"))
-        prompt_title.setStyleSheet("font-weight: bold; color: #ccc; font-size: 12px;")
-        prompt_header.addWidget(prompt_title)
-        prompt_header.addStretch()
-        copy_btn = QPushButton(_t("copy"))
-        copy_btn.setFixedHeight(24)
-        copy_btn.setStyleSheet(
-            "QPushButton { color: #aaa; background: transparent; "
-            "border: 1px solid #555; border-radius: 3px; font-size: 11px; padding: 0 8px; }"
-            "QPushButton:hover { background: rgba(42,130,218,0.25); color: #fff; }"
-        )
-        copy_btn.setToolTip(_t("copy_tip"))
-        copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(self.prompt))
-        prompt_header.addWidget(copy_btn)
-        feedback_layout.addLayout(prompt_header)
-
-        self.description_text = QTextEdit()
-        self.description_text.setMarkdown(self.prompt)
-        self.description_text.setReadOnly(True)
-        self.description_text.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.description_text.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.description_text.setStyleSheet(
-            "QTextEdit { background: #2a2a2a; border: 1px solid #555; "
-            "border-radius: 4px; padding: 8px; color: #e0e0e0; font-size: 13px; }"
-            "QTextEdit code { background: #1a1a1a; color: #e8a040; padding: 1px 4px; border-radius: 2px; }"
-        )
-        self.description_text.document().setDocumentMargin(4)
-        font_h = self.description_text.fontMetrics().height()
-        self.description_text.setMinimumHeight(5 * font_h + 20)
-        self.description_text.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        feedback_layout.addWidget(self.description_text, stretch=3)
-
-        self.option_checkboxes = []
-        if self.predefined_options and len(self.predefined_options) > 0:
-            options_frame = QFrame()
-            options_layout = QVBoxLayout(options_frame)
-            options_layout.setContentsMargins(0, 10, 0, 10)
-
-            for option in self.predefined_options:
-                checkbox = QCheckBox(option)
-                self.option_checkboxes.append(checkbox)
-                options_layout.addWidget(checkbox)
-
-            feedback_layout.addWidget(options_frame)
-
-            separator = QFrame()
-            separator.setFrameShape(QFrame.HLine)
-            separator.setFrameShadow(QFrame.Sunken)
-            feedback_layout.addWidget(separator)
-
-        self.feedback_text = FeedbackTextEdit()
-        self.feedback_text.image_pasted.connect(self._on_image_pasted)
-        font_metrics = self.feedback_text.fontMetrics()
-        row_height = font_metrics.height()
-        padding = self.feedback_text.contentsMargins().top() + self.feedback_text.contentsMargins().bottom() + 5
-        self.feedback_text.setMinimumHeight(5 * row_height + padding)
-        self.feedback_text.setPlaceholderText(_t("placeholder"))
-        feedback_layout.addWidget(self.feedback_text, stretch=1)
+        if self.questions:
+            self._create_questions_section(feedback_layout)
+        else:
+            self._create_prompt_section(feedback_layout)
 
         # --- Screenshot section ---
         screenshot_section = QFrame()
@@ -815,21 +1030,27 @@ class FeedbackUI(QMainWindow):
         self.screenshot_count_label.setVisible(False)
         screenshot_main_layout.addWidget(self.screenshot_count_label)
 
-        self.screenshots_scroll = QScrollArea()
-        self.screenshots_scroll.setWidgetResizable(True)
-        self.screenshots_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.screenshots_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.screenshots_scroll.setFixedHeight(140)
-        self.screenshots_scroll.setVisible(False)
-        self.screenshots_scroll.setStyleSheet("QScrollArea { border: 1px solid #555; border-radius: 4px; }")
-
-        self.thumbnails_container = QWidget()
-        self.thumbnails_layout = QHBoxLayout(self.thumbnails_container)
-        self.thumbnails_layout.setAlignment(Qt.AlignLeft)
-        self.thumbnails_layout.setContentsMargins(4, 4, 4, 4)
-        self.screenshots_scroll.setWidget(self.thumbnails_container)
-
-        screenshot_main_layout.addWidget(self.screenshots_scroll)
+        # Only visible rows are painted, so long strips cost nothing offscreen.
+        self.thumbnail_model = _ThumbnailModel(self)
+        thumbnail_delegate = _ThumbnailDelegate(self)
+        thumbnail_delegate.preview_requested.connect(self._preview_screenshot)
+        thumbnail_delegate.remove_requested.connect(self._remove_screenshot)
+        self.thumbnail_view = QListView()
+        self.thumbnail_view.setModel(self.thumbnail_model)
+        self.thumbnail_view.setItemDelegate(thumbnail_delegate)
+        self.thumbnail_view.setFlow(QListView.LeftToRight)
+        self.thumbnail_view.setWrapping(False)
+        self.thumbnail_view.setUniformItemSizes(True)
+        self.thumbnail_view.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.thumbnail_view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.thumbnail_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.thumbnail_view.setFocusPolicy(Qt.NoFocus)
+        self.thumbnail_view.setMouseTracking(True)
+        self.thumbnail_view.setFixedHeight(140)
+        self.thumbnail_view.setVisible(False)
+        self.thumbnail_view.setStyleSheet("QListView { border: 1px solid #555; border-radius: 4px; }")
+
+        screenshot_main_layout.addWidget(self.thumbnail_view)
         feedback_layout.addWidget(screenshot_section)
 
         toggle_bar = QHBoxLayout()
@@ -906,6 +1127,118 @@ class FeedbackUI(QMainWindow):
 
         layout.addWidget(self.feedback_group)
 
+    def _create_prompt_section(self, feedback_layout: QVBoxLayout):
+        prompt_header = QHBoxLayout()
+        prompt_title = QLabel(_t("message"))
+        prompt_title.setStyleSheet("font-weight: bold; color: #ccc; font-size: 12px;")
+        prompt_header.addWidget(prompt_title)
+        prompt_header.addStretch()
+        copy_btn = QPushButton(_t("copy"))
+        copy_btn.setFixedHeight(24)
+        copy_btn.setStyleSheet(
+            "QPushButton { color: #aaa; background: transparent; "
+            "border: 1px solid #555; border-radius: 3px; font-size: 11px; padding: 0 8px; }"
+            "QPushButton:hover { background: rgba(42,130,218,0.25); color: #fff; }"
+        )
+        copy_btn.setToolTip(_t("copy_tip"))
+        copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(self.prompt))
+        prompt_header.addWidget(copy_btn)
+        feedback_layout.addLayout(prompt_header)
+
+        self.description_text = QTextEdit()
+        self.description_text.setMarkdown(self.prompt)
+        self.description_text.setReadOnly(True)
+        self.description_text.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.description_text.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.description_text.setStyleSheet(
+            "QTextEdit { background: #2a2a2a; border: 1px solid #555; "
+            "border-radius: 4px; padding: 8px; color: #e0e0e0; font-size: 13px; }"
+            "QTextEdit code { background: #1a1a1a; color: #e8a040; padding: 1px 4px; border-radius: 2px; }"
+        )
+        self.description_text.document().setDocumentMargin(4)
+        font_h = self.description_text.fontMetrics().height()
+        self.description_text.setMinimumHeight(5 * font_h + 20)
+        self.description_text.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        feedback_layout.addWidget(self.description_text, stretch=3)
+
+        self.option_checkboxes = []
+        if self.predefined_options and len(self.predefined_options) > 0:
+            options_frame = QFrame()
+            options_layout = QVBoxLayout(options_frame)
+            options_layout.setContentsMargins(0, 10, 0, 10)
+
+            for option in self.predefined_options:
+                checkbox = QCheckBox(option)
+                self.option_checkboxes.append(checkbox)
+                options_layout.addWidget(checkbox)
+
+            feedback_layout.addWidget(options_frame)
+
+            separator = QFrame()
+            separator.setFrameShape(QFrame.HLine)
+            separator.setFrameShadow(QFrame.Sunken)
+            feedback_layout.addWidget(separator)
+
+        self.feedback_text = FeedbackTextEdit()
+        self.feedback_text.image_pasted.connect(self._on_image_pasted)
+        font_metrics = self.feedback_text.fontMetrics()
+        row_height = font_metrics.height()
+        padding = self.feedback_text.contentsMargins().top() + self.feedback_text.contentsMargins().bottom() + 5
+        self.feedback_text.setMinimumHeight(5 * row_height + padding)
+        self.feedback_text.setPlaceholderText(_t("placeholder"))
+        feedback_layout.addWidget(self.feedback_text, stretch=1)
+
+    def _create_questions_section(self, feedback_layout: QVBoxLayout):
+        """Batch mode: one section per question, each with its own options and answer box."""
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setStyleSheet("QScrollArea { border: none; }")
+        container = QWidget()
+        sections_layout = QVBoxLayout(container)
+        sections_layout.setContentsMargins(0, 0, 4, 0)
+
+        self.option_checkboxes = []
+        self._question_widgets: list[tuple[list[QCheckBox], FeedbackTextEdit]] = []
+        for i, question in enumerate(self.questions):
+            section = QGroupBox(_t("question_n", i=i + 1, n=len(self.questions)))
+            section.setStyleSheet(
+                "QGroupBox { border: 1px solid #555; border-radius: 4px; margin-top: 8px; padding-top: 12px; color: #ccc; }"
+                "QGroupBox::title { subcontrol-origin: margin; left: 10px; padding: 0 4px; }"
+            )
+            section_layout = QVBoxLayout(section)
+
+            message = QLabel(question["message"])
+            message.setTextFormat(Qt.MarkdownText)
+            message.setWordWrap(True)
+            message.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            message.setStyleSheet("color: #e0e0e0; font-size: 13px; padding: 2px 4px;")
+            section_layout.addWidget(message)
+
+            checkboxes = []
+            for option in question.get("predefined_options") or []:
+                checkbox = QCheckBox(option)
+                checkboxes.append(checkbox)
+                section_layout.addWidget(checkbox)
+
+            answer = FeedbackTextEdit()
+            answer.image_pasted.connect(self._on_image_pasted)
+            answer.setPlaceholderText(_t("answer_placeholder"))
+            row_height = answer.fontMetrics().height()
+            answer.setMinimumHeight(3 * row_height + 16)
+            answer.setMaximumHeight(6 * row_height + 16)
+            # Quick replies and auto-submit act on whichever answer box was used last.
+            answer.focused.connect(lambda edit=answer: setattr(self, "feedback_text", edit))
+            section_layout.addWidget(answer)
+
+            self._question_widgets.append((checkboxes, answer))
+            sections_layout.addWidget(section)
+
+        sections_layout.addStretch()
+        scroll.setWidget(container)
+        feedback_layout.addWidget(scroll, stretch=4)
+        self.feedback_text = self._question_widgets[0][1]
+
     # --- Auto-submit ---
 
     def _start_auto_submit(self, seconds: int):
@@ -943,14 +1276,12 @@ class FeedbackUI(QMainWindow):
         if mime.hasImage():
             image = mime.imageData()
             if image and not image.isNull():
-                self._add_screenshot(QPixmap.fromImage(image))
+                self._ingest([image])
         elif mime.hasUrls():
-            for url in mime.urls():
-                path = url.toLocalFile()
-                if path and os.path.isfile(path):
-                    pixmap = QPixmap(path)
-                    if not pixmap.isNull():
-                        self._add_screenshot(pixmap)
+            self._ingest([
+                path for path in (url.toLocalFile() for url in mime.urls())
+                if path and os.path.isfile(path)
+            ])
 
     def _open_docs(self):
         DocsDialog(self).exec()
@@ -1025,7 +1356,7 @@ class FeedbackUI(QMainWindow):
         if screen:
             pixmap = screen.grabWindow(0)
             if not pixmap.isNull():
-                self._add_screenshot(pixmap)
+                self._ingest([pixmap.toImage()])
         self.showNormal()
         self.activateWindow()
         self.raise_()
@@ -1036,81 +1367,173 @@ class FeedbackUI(QMainWindow):
         if mime and mime.hasImage():
             image = clipboard.image()
             if not image.isNull():
-                self._add_screenshot(QPixmap.fromImage(image))
+                self._ingest([image])
 
     def _on_image_pasted(self, image: QImage):
-        pixmap = QPixmap.fromImage(image)
-        if not pixmap.isNull():
-            self._add_screenshot(pixmap)
+        if not image.isNull():
+            self._ingest([image])
 
     def _browse_image(self):
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, _t("select_images"), "",
             _t("image_filter"),
         )
-        for path in file_paths:
-            pixmap = QPixmap(path)
-            if not pixmap.isNull():
-                self._add_screenshot(pixmap)
+        self._ingest(file_paths)
+
+    def _ingest(self, sources: list):
+        """Queue file paths or QImages for decoding; placeholders show until each one is ready."""
+        for source in sources:
+            job = _IngestJob(source)
+            job.signals.finished.connect(self._flush_ingested)
+            self._ingesting.append(job)
+            self._ingest_pool.start(job)
+        if sources:
+            self.thumbnail_model.set_pending(len(self._ingesting))
+            self._update_screenshot_summary()
+
+    def _flush_ingested(self, _job=None):
+        """Add finished images in arrival order, stopping at the first one still decoding."""
+        finished = []
+        while self._ingesting and self._ingesting[0].done:
+            finished.append(self._ingesting.pop(0))
+        if finished:
+            self.thumbnail_model.set_pending(len(self._ingesting))
+            decoded = [job for job in finished if job.image is not None]
+            rejected = [job.name for job in finished if job.too_large]
+            if rejected:
+                _log(f"Skipped {len(rejected)} image file(s) over the decode budget: {', '.join(rejected)}", "WARNING")
+                self._ingest_notice = _t("image_too_large", files=", ".join(rejected), mb=_decode_budget_mb())
+            self._add_screenshots(
+                [QPixmap.fromImage(job.image) for job in decoded],
+                [QPixmap.fromImage(job.thumbnail) for job in decoded],
+            )
+
+    def _finish_ingest(self):
+        for job in list(self._ingesting):
+            job.wait(self._ingest_pool)
+        self._flush_ingested()
 
     def _add_screenshot(self, pixmap: QPixmap):
-        max_size = 1600
-        if pixmap.width() > max_size or pixmap.height() > max_size:
-            pixmap = pixmap.scaled(max_size, max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.screenshots.append(pixmap)
-        self._update_thumbnails()
+        self._add_screenshots([pixmap])
+
+    def _add_screenshots(self, pixmaps: list[QPixmap], thumbs: list[QPixmap] | None = None):
+        pixmaps = [
+            pixmap.scaled(_MAX_SCREENSHOT_EDGE, _MAX_SCREENSHOT_EDGE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            if pixmap.width() > _MAX_SCREENSHOT_EDGE or pixmap.height() > _MAX_SCREENSHOT_EDGE else pixmap
+            for pixmap in pixmaps
+        ]
+        self.screenshots += pixmaps
+        self._encode_jobs += [None] * len(pixmaps)
+        self.thumbnail_model.append(pixmaps, thumbs or [None] * len(pixmaps))
+        self._refresh_encode_jobs()
+        self._update_screenshot_summary()
 
     def _remove_screenshot(self, index: int):
         if 0 <= index < len(self.screenshots):
             self.screenshots.pop(index)
-            self._update_thumbnails()
-
-    def _update_thumbnails(self):
-        while self.thumbnails_layout.count():
-            item = self.thumbnails_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        for i, pixmap in enumerate(self.screenshots):
-            thumb = ScreenshotThumbnail(pixmap, i)
-            thumb.removed.connect(self._remove_screenshot)
-            self.thumbnails_layout.addWidget(thumb)
+            self._encode_jobs.pop(index).cancel()
+            self.thumbnail_model.remove(index)
+            self._refresh_encode_jobs()
+            self._update_screenshot_summary()
 
+    def _preview_screenshot(self, index: int):
+        if 0 <= index < len(self.screenshots):
+            ImagePreviewDialog(self.screenshots[index], self).exec()
+
+    def _refresh_encode_jobs(self):
+        """(Re)start encodes whose budget-fitted size changed with the current set of screenshots."""
+        fitted = _fit_to_budget([(p.width(), p.height()) for p in self.screenshots], _image_token_budget())
+        fmt, quality = _image_codec()
+        for i, (pixmap, size) in enumerate(zip(self.screenshots, fitted)):
+            job = self._encode_jobs[i]
+            if job is not None and job.size == size:
+                continue
+            if job is not None:
+                job.cancel()
+            self._encode_jobs[i] = _EncodeJob(pixmap.toImage(), size, fmt, quality)
+            self._encode_jobs[i].start()
+
+    def _cancel_encode_jobs(self):
+        for job in self._encode_jobs:
+            job.cancel()
+        self._encode_jobs = []
+
+    def _update_screenshot_summary(self):
         has_screenshots = len(self.screenshots) > 0
-        self.screenshots_scroll.setVisible(has_screenshots)
-        self.screenshot_count_label.setVisible(has_screenshots)
+        notice, self._ingest_notice = self._ingest_notice, ""
+        self.thumbnail_view.setVisible(has_screenshots or bool(self._ingesting))
+        self.screenshot_count_label.setVisible(has_screenshots or bool(notice))
+        self.screenshot_count_label.setText(notice)
         if has_screenshots:
-            self.screenshot_count_label.setText(_t("screenshots_count", n=len(self.screenshots)))
+            # Preview what submit will send: the same budget fit _stream_result applies.
+            sizes = [(p.width(), p.height()) for p in self.screenshots]
+            budget = _image_token_budget()
+            fitted = _fit_to_budget(sizes, budget)
+            text = _t("screenshots_count", n=len(self.screenshots))
+            text += " · " + _t("screenshots_tokens", tokens=sum(_image_tokens(w, h) for w, h in fitted))
+            if fitted != sizes:
+                text += " " + _t("screenshots_scaled", budget=budget)
+            self.screenshot_count_label.setText(text + (f"\n{notice}" if notice else ""))
+        self._emit_state()
 
     @staticmethod
-    def _pixmap_to_base64(pixmap: QPixmap) -> str:
+    def _pixmap_to_png_array(pixmap: QPixmap) -> QByteArray:
         byte_array = QByteArray()
         buffer = QBuffer(byte_array)
         buffer.open(QIODevice.WriteOnly)
         pixmap.save(buffer, "PNG")
         buffer.close()
-        return byte_array.toBase64().data().decode('ascii')
+        return byte_array
+
+    @staticmethod
+    def _pixmap_to_png(pixmap: QPixmap) -> bytes:
+        return FeedbackUI._pixmap_to_png_array(pixmap).data()
+
+    @staticmethod
+    def _pixmap_to_base64(pixmap: QPixmap) -> str:
+        return FeedbackUI._pixmap_to_png_array(pixmap).toBase64().data().decode('ascii')
 
     # --- Submit / Close ---
 
+    def _collect_answers(self) -> list[dict]:
+        answers = []
+        for question, (checkboxes, answer) in zip(self.questions, self._question_widgets):
+            options = question.get("predefined_options") or []
+            answers.append({
+                "question": question["message"],
+                "selected_options": [options[i] for i, cb in enumerate(checkboxes) if cb.isChecked()],
+                "feedback": answer.toPlainText().strip(),
+            })
+        return answers
+
     def _submit_feedback(self):
         self._auto_timer.stop()
-        feedback_text = self.feedback_text.toPlainText().strip()
-        selected_options = []
-
-        if self.option_checkboxes:
-            for i, checkbox in enumerate(self.option_checkboxes):
-                if checkbox.isChecked():
-                    selected_options.append(self.predefined_options[i])
-
+        self._finish_ingest()
         final_feedback_parts = []
-        if selected_options:
-            final_feedback_parts.append("; ".join(selected_options))
-        if feedback_text:
-            final_feedback_parts.append(feedback_text)
+        answers = None
+        answer = None
 
-        has_content = bool(final_feedback_parts) or len(self.screenshots) > 0
+        if self.questions:
+            # Per-question answers travel separately; the text only carries the toggle hints.
+            answers = self._collect_answers()
+            has_content = any(a["selected_options"] or a["feedback"] for a in answers)
+        else:
+            feedback_text = self.feedback_text.toPlainText().strip()
+            selected_options = []
+
+            if self.option_checkboxes:
+                for i, checkbox in enumerate(self.option_checkboxes):
+                    if checkbox.isChecked():
+                        selected_options.append(self.predefined_options[i])
+
+            if selected_options:
+                final_feedback_parts.append("; ".join(selected_options))
+            if feedback_text:
+                final_feedback_parts.append(feedback_text)
+            has_content = bool(final_feedback_parts)
+            answer = {"selected_options": selected_options, "feedback": feedback_text}
+
+        has_content = has_content or len(self.screenshots) > 0
         if has_content and self.chinese_toggle.isChecked():
             final_feedback_parts.append("(请使用中文回复和思考)")
         if has_content and self.reload_rules_toggle.isChecked():
@@ -1121,37 +1544,278 @@ class FeedbackUI(QMainWindow):
 
         final_feedback = "\n\n".join(final_feedback_parts)
 
-        images_b64 = [self._pixmap_to_base64(p) for p in self.screenshots]
-
+        # Encoding is left to the consumer so the worker can stream images one by one.
+        self.submitted_screenshots = list(self.screenshots)
+        self.submitted_encode_jobs = list(self._encode_jobs)
+        self.submitted_at = time.time()
         self.feedback_result = FeedbackResult(
             interactive_feedback=final_feedback,
-            images=images_b64,
+            images=[],
         )
+        if answers is not None:
+            self.feedback_result["answers"] = answers
+        if answer is not None:
+            self.feedback_result["answer"] = answer
         self.close()
 
     def closeEvent(self, event):
+        self._ingest_pool.clear()
         self.settings.beginGroup("MainWindow_General")
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
         self.settings.endGroup()
         super().closeEvent(event)
+        self.closed.emit()
 
-    def run(self) -> FeedbackResult:
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
+
+    def present(self):
+        """Show the window and keep pulling it to the front while it settles."""
         self._force_foreground()
         QTimer.singleShot(100, self._force_foreground)
         QTimer.singleShot(500, self._force_foreground)
+        if os.environ.get("MCP_FEEDBACK_AUTOSUBMIT"):
+            self._schedule_autosubmit(os.environ["MCP_FEEDBACK_AUTOSUBMIT"])
+
+    def _schedule_autosubmit(self, spec: str):
+        """Benchmark hook: "delay_ms[,images[,width]]" submits with synthetic screenshots."""
+        try:
+            delay, images, width = ([int(v) for v in spec.split(",")] + [0, 1600])[:3]
+        except ValueError:
+            return
+
+        def submit():
+            for pixmap in _noise_pixmaps(images, width):
+                self._add_screenshot(pixmap)
+            self.feedback_text.setPlainText("autosubmit")
+            self._submit_feedback()
+
+        QTimer.singleShot(delay, submit)
+
+    def run(self) -> FeedbackResult:
+        self.present()
         QApplication.instance().exec()
 
         if not self.feedback_result:
             return FeedbackResult(interactive_feedback="", images=[])
 
-        return self.feedback_result
+        result = FeedbackResult(
+            interactive_feedback=self.feedback_result["interactive_feedback"],
+            images=[
+                self._pixmap_to_base64(QPixmap.fromImage(image))
+                for image in _apply_budget([p.toImage() for p in self.submitted_screenshots])
+            ],
+        )
+        if "answers" in self.feedback_result:
+            result["answers"] = self.feedback_result["answers"]
+        return result
+
+# --- Screenshot encoding ---
+#
+# MCP_FEEDBACK_IMAGE_FORMAT picks png, jpeg, webp or auto (default). Auto keeps
+# UI and text captures lossless and sends photographic content lossy, judged
+# by how many distinct colours a small nearest-neighbour sample contains.
+
+_IMAGE_FORMATS = ("png", "jpeg", "webp")
+_SAMPLE_SIZE = 128
+_PHOTO_COLOR_RATIO = 0.35  # distinct colours per sampled pixel above which a capture counts as a photo
+
+
+def _image_codec() -> tuple[str, int]:
+    fmt = os.environ.get("MCP_FEEDBACK_IMAGE_FORMAT", "auto").lower().replace("jpg", "jpeg")
+    if fmt not in (*_IMAGE_FORMATS, "auto"):
+        fmt = "auto"
+    try:
+        quality = int(os.environ.get("MCP_FEEDBACK_IMAGE_QUALITY", 85))
+    except ValueError:
+        quality = 85
+    return fmt, max(1, min(100, quality))
+
+
+def _write_image(image: QImage, fmt: str, quality: int) -> bytes:
+    byte_array = QByteArray()
+    buffer = QBuffer(byte_array)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, fmt.upper(), -1 if fmt == "png" else quality)
+    buffer.close()
+    return byte_array.data()
+
+
+def _is_photographic(sample: QImage) -> bool:
+    """UI and text screenshots reuse a small palette; photos and video frames don't."""
+    pixels = memoryview(sample.constBits()).cast("I")
+    return len(set(pixels)) / len(pixels) > _PHOTO_COLOR_RATIO
+
+
+def _encode_image(image: QImage, fmt: str = "png", quality: int = 85) -> tuple[bytes, str, int]:
+    """Encode one screenshot; safe to call off the GUI thread.
+
+    Returns (data, format actually used, estimated PNG size). For lossy output
+    the PNG size is extrapolated from the sample instead of encoding twice.
+    """
+    sample = None
+    if fmt != "png":
+        sample = image.scaled(_SAMPLE_SIZE, _SAMPLE_SIZE, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        sample = sample.convertToFormat(QImage.Format_RGB32)
+    if fmt == "auto":
+        if not _is_photographic(sample):
+            fmt = "png"
+        else:
+            fmt = "webp" if b"webp" in [f.data() for f in QImageWriter.supportedImageFormats()] else "jpeg"
+    data = _write_image(image, fmt, quality)
+    if fmt == "png":
+        return data, fmt, len(data)
+    ratio = len(_write_image(sample, "png", quality)) / max(1, len(_write_image(sample, fmt, quality)))
+    return data, fmt, int(len(data) * ratio)
+
+
+_pending_encodes: set = set()
+
+
+class _EncodeJob(QRunnable):
+    """Scale one screenshot to its budget size and encode it on the global QThreadPool.
 
-def feedback_ui(prompt: str, predefined_options: list[str] | None = None, output_file: str | None = None, window_id: str = "0") -> FeedbackResult | None:
+    result() hands back what _encode_image returned, encoding on the calling
+    thread instead if the job never got a pool thread.
+    """
+
+    def __init__(self, image: QImage, size: tuple[int, int], fmt: str, quality: int):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.image = image
+        self.size = size
+        self.fmt = fmt
+        self.quality = quality
+        self._started = False
+        self._cancelled = False
+        self._claim = threading.Lock()
+        self._done = threading.Event()
+        self._result: tuple[bytes, str, int] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def start(self):
+        self._started = True
+        _pending_encodes.add(self)  # the pool does not own the Python object
+        QThreadPool.globalInstance().start(self)
+
+    def cancel(self):
+        self._cancelled = True
+        if self._started and QThreadPool.globalInstance().tryTake(self):
+            _pending_encodes.discard(self)
+        self.image = None
+        self._result = None
+
+    def run(self):
+        # The pool and a waiting result() may both get here; the first one encodes.
+        if not self._claim.acquire(blocking=False):
+            return
+        try:
+            image = self.image
+            if not self._cancelled and image is not None:
+                if (image.width(), image.height()) != self.size:
+                    image = image.scaled(*self.size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                self._result = _encode_image(image, self.fmt, self.quality)
+        finally:
+            self._done.set()
+            _pending_encodes.discard(self)
+
+    def result(self) -> tuple[bytes, str, int]:
+        if not self._started or QThreadPool.globalInstance().tryTake(self):
+            self.run()
+        self._done.wait()
+        return self._result
+
+
+# --- Image budget ---
+#
+# MCP_FEEDBACK_IMAGE_TOKEN_BUDGET caps the estimated model tokens spent on all
+# images of one call (0 disables it). Vision models bill about
+# width * height / 750 tokens per image, so this is a pixel budget: the largest
+# images are shrunk first, and none goes below _MIN_IMAGE_EDGE on its long
+# side so text stays legible.
+
+_TOKEN_PIXELS = 750
+_MIN_IMAGE_EDGE = 768
+
+
+def _image_token_budget() -> int:
+    try:
+        return max(0, int(os.environ.get("MCP_FEEDBACK_IMAGE_TOKEN_BUDGET", 8000)))
+    except ValueError:
+        return 8000
+
+
+def _image_tokens(width: int, height: int) -> int:
+    return math.ceil(width * height / _TOKEN_PIXELS)
+
+
+def _fit_to_budget(sizes: list[tuple[int, int]], budget: int) -> list[tuple[int, int]]:
+    """Target (width, height) for each image so their total tokens fit the budget."""
+    if not budget or sum(_image_tokens(w, h) for w, h in sizes) <= budget:
+        return list(sizes)
+    # Water-fill: find the per-image pixel cap that spends the budget exactly,
+    # so images already below it keep their full resolution.
+    remaining = budget * _TOKEN_PIXELS
+    areas = sorted(w * h for w, h in sizes)
+    cap = remaining / len(areas)
+    for k, area in enumerate(areas):
+        cap = remaining / (len(areas) - k)
+        if area > cap:
+            break
+        remaining -= area
+    fitted = []
+    for w, h in sizes:
+        scale = min(1.0, math.sqrt(cap / (w * h)))
+        scale = max(scale, min(1.0, _MIN_IMAGE_EDGE / max(w, h)))
+        fitted.append((max(1, int(w * scale)), max(1, int(h * scale))))
+    return fitted
+
+
+def _apply_budget(images: list[QImage]) -> list[QImage]:
+    sizes = [(image.width(), image.height()) for image in images]
+    fitted = _fit_to_budget(sizes, _image_token_budget())
+    return [
+        image if size == target else image.scaled(*target, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        for image, size, target in zip(images, sizes, fitted)
+    ]
+
+
+def _budget_encode_jobs(images: list[QImage]) -> list[_EncodeJob]:
+    """Unstarted encode jobs for images that were not encoded while attached."""
+    fitted = _fit_to_budget([(image.width(), image.height()) for image in images], _image_token_budget())
+    fmt, quality = _image_codec()
+    return [_EncodeJob(image, size, fmt, quality) for image, size in zip(images, fitted)]
+
+
+def _noise_pixmaps(count: int, width: int) -> list[QPixmap]:
+    """Random-noise screenshots (incompressible, the worst case for PNG) for benchmarks."""
+    height = width * 10 // 16
+    pixmaps = []
+    for i in range(count):
+        data = random.Random(i).randbytes(width * height * 3)
+        image = QImage(data, width, height, width * 3, QImage.Format_RGB888).copy()
+        pixmaps.append(QPixmap.fromImage(image))
+    return pixmaps
+
+
+def _init_app() -> QApplication:
     app = QApplication.instance() or QApplication()
     app.setPalette(get_dark_mode_palette(app))
     app.setStyle("Fusion")
-    ui = FeedbackUI(prompt, predefined_options, window_id=window_id)
+    return app
+
+
+def feedback_ui(prompt: str, predefined_options: list[str] | None = None, output_file: str | None = None, window_id: str = "0",
+                questions: list[dict] | None = None) -> FeedbackResult | None:
+    _init_app()
+    ui = FeedbackUI(prompt, predefined_options, window_id=window_id, questions=questions)
     result = ui.run()
 
     if output_file and result:
@@ -1162,19 +1826,220 @@ def feedback_ui(prompt: str, predefined_options: list[str] | None = None, output
 
     return result
 
-if __name__ == "__main__":
+
+# --- Worker mode ---
+#
+# A worker is a long-lived UI process kept warm by the server. Both directions
+# use length-prefixed frames: a 1-byte kind, a 4-byte big-endian payload length,
+# then the payload.
+#
+#   server -> worker  C  control JSON: {"cmd": "show", "prompt", "predefined_options", "window_id", "questions"?}
+#                                      {"cmd": "shutdown"}
+#   worker -> server  C  control JSON: {"event": "ready"}
+#                                      {"event": "shown" | "painted", "ts": float}
+#                                      {"event": "state", "ts", "focused", "draft_chars", "screenshots", "last_input"}
+#                     T  result text JSON: {"interactive_feedback": str, "image_count": int, "answers"?: [...],
+#                                           "answer"?: {"selected_options", "feedback"}, "submitted_at"?: float}
+#                     I  image chunk: 2-byte image index, 1-byte last-chunk flag, 1-byte format
+#                        (p/j/w for png/jpeg/webp), raw encoded bytes
+#                     D  done JSON: {"encoded_bytes": int, "png_bytes": int} (PNG size estimated for lossy images)
+#                     L  log record JSON: {"ts": float, "level": str, "msg": str}, written to the server log
+#
+# Images are encoded on a background thread and sent one at a time, so the
+# server can write image N to disk while image N+1 is still being encoded, and
+# the file on disk holds exactly the bytes Qt produced.
+
+_FRAME_HEADER = struct.Struct(">cI")
+_IMAGE_CHUNK_HEADER = struct.Struct(">HBc")
+_IMAGE_CHUNK_SIZE = 256 * 1024
+
+_frame_out = None
+_frame_lock = threading.Lock()
+
+
+def _send_frame(kind: bytes, *parts: bytes | memoryview):
+    with _frame_lock:
+        _frame_out.write(_FRAME_HEADER.pack(kind, sum(len(p) for p in parts)))
+        for part in parts:
+            _frame_out.write(part)
+        _frame_out.flush()
+
+
+def _send_message(msg: dict):
+    _send_frame(b"C", json.dumps(msg, ensure_ascii=False).encode("utf-8"))
+
+
+def _log(msg: str, level: str = "INFO"):
+    """Log into the server's log sink when running as a worker, else to stderr."""
+    if _frame_out is None:
+        print(f"{level} {msg}", file=sys.stderr)
+        return
+    try:
+        _send_frame(b"L", json.dumps({"ts": time.time(), "level": level, "msg": msg}, ensure_ascii=False).encode("utf-8"))
+    except (OSError, ValueError):
+        pass
+
+
+def _log_excepthook(exc_type, exc, tb):
+    import traceback
+    _log("".join(traceback.format_exception(exc_type, exc, tb)).rstrip(), "ERROR")
+
+
+def _read_exact(stream, n: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def _result_payload(ui: "FeedbackUI") -> tuple[dict, list[_EncodeJob]]:
+    """Snapshot a finished window's result on the GUI thread: (text JSON, image encode jobs)."""
+    result = ui.feedback_result or FeedbackResult(interactive_feedback="", images=[])
+    pixmaps = ui.submitted_screenshots if ui.feedback_result else []
+    text = {"interactive_feedback": result["interactive_feedback"], "image_count": len(pixmaps)}
+    if ui.feedback_result and ui.submitted_at is not None:
+        text["submitted_at"] = ui.submitted_at
+    for key in ("answers", "answer"):
+        if key in result:
+            text[key] = result[key]
+    jobs = ui.submitted_encode_jobs
+    if not ui.feedback_result:
+        ui._cancel_encode_jobs()
+        jobs = []
+    elif len(jobs) != len(pixmaps):
+        jobs = _budget_encode_jobs([p.toImage() for p in pixmaps])
+    return text, jobs
+
+
+def _stream_result(text: dict, jobs: list[_EncodeJob]):
+    """Send a result as T, I... and D frames.
+
+    Screenshots were normally encoded (budget-fitted, configured codec) in the
+    background while attached; any job still pending is finished here, so
+    this only touches QImage and can run on any thread.
+    """
+    _send_frame(b"T", json.dumps(text, ensure_ascii=False).encode("utf-8"))
+    if jobs:
+        _log(f"{sum(job.ready for job in jobs)}/{len(jobs)} screenshot(s) already encoded at submit", "DEBUG")
+    encoded_bytes = png_bytes = 0
+    for index, job in enumerate(jobs):
+        data, used, png_size = job.result()
+        encoded_bytes += len(data)
+        png_bytes += png_size
+        data = memoryview(data)
+        for offset in range(0, len(data), _IMAGE_CHUNK_SIZE):
+            last = offset + _IMAGE_CHUNK_SIZE >= len(data)
+            header = _IMAGE_CHUNK_HEADER.pack(index, last, used[:1].encode())
+            _send_frame(b"I", header, data[offset:offset + _IMAGE_CHUNK_SIZE])
+    _send_frame(b"D", json.dumps({"encoded_bytes": encoded_bytes, "png_bytes": png_bytes}).encode())
+
+
+class _WorkerChannel(QObject):
+    """Reads control frames from stdin on a background thread."""
+    message_received = Signal(dict)
+    eof = Signal()
+
+    def start(self):
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _read_loop(self):
+        stream = sys.stdin.buffer
+        while True:
+            header = _read_exact(stream, _FRAME_HEADER.size)
+            if header is None:
+                break
+            kind, length = _FRAME_HEADER.unpack(header)
+            payload = _read_exact(stream, length)
+            if payload is None:
+                break
+            if kind != b"C":
+                continue
+            try:
+                self.message_received.emit(json.loads(payload))
+            except json.JSONDecodeError:
+                continue
+        self.eof.emit()
+
+
+def run_worker():
+    """Serve feedback requests from the server until told to shut down."""
+    global _frame_out
+    # stdout carries the frame protocol; keep stray prints out of it.
+    _frame_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    sys.excepthook = _log_excepthook
+
+    app = _init_app()
+    app.setQuitOnLastWindowClosed(False)
+    channel = _WorkerChannel()
+    active: dict[str, FeedbackUI] = {}
+
+    def on_message(msg: dict):
+        cmd = msg.get("cmd")
+        if cmd == "shutdown":
+            app.quit()
+        elif cmd == "show" and "ui" not in active:
+            ui = FeedbackUI(
+                msg.get("prompt", ""),
+                msg.get("predefined_options") or None,
+                window_id=str(msg.get("window_id", "0")),
+                questions=msg.get("questions") or None,
+            )
+            active["ui"] = ui
+
+            def on_closed():
+                active.pop("ui", None)
+                _log(f"Window #{ui._window_id} closed, sending {len(ui.submitted_screenshots) if ui.feedback_result else 0} image(s)", "DEBUG")
+                threading.Thread(target=_stream_result, args=_result_payload(ui), daemon=True).start()
+                ui.deleteLater()
+
+            ui.closed.connect(on_closed)
+            ui.first_painted.connect(lambda: _send_message({"event": "painted", "ts": time.time()}))
+            ui.state_changed.connect(lambda state: _send_message({"event": "state", "ts": time.time(), **state}))
+            ui.present()
+            _send_message({"event": "shown", "ts": time.time()})
+
+    channel.message_received.connect(on_message)
+    channel.eof.connect(app.quit)
+    channel.start()
+    _log(f"Worker ready (Qt {qVersion()})", "DEBUG")
+    _send_message({"event": "ready"})
+    app.exec()
+    # The stdin reader thread is still blocked in read(); interpreter teardown
+    # would abort trying to take the stdin buffer lock, so skip it.
+    _frame_out.flush()
+    sys.stderr.flush()
+    os._exit(0)
+
+
+def main():
     parser = argparse.ArgumentParser(description="Run the feedback UI")
     parser.add_argument("--prompt", default="I implemented the changes you requested.", help="The prompt to show to the user")
     parser.add_argument("--predefined-options", default="", help="Pipe-separated list of predefined options (|||)")
     parser.add_argument("--output-file", help="Path to save the feedback result as JSON")
     parser.add_argument("--window-id", default="0", help="Window identifier for multi-agent scenarios")
+    parser.add_argument("--questions", default="", help='JSON list of {"message", "predefined_options"} to ask in one window')
+    parser.add_argument("--worker", action="store_true", help="Run as a pooled worker driven over stdin/stdout")
     args = parser.parse_args()
 
+    if args.worker:
+        run_worker()
+        sys.exit(0)
+
     predefined_options = [opt for opt in args.predefined_options.split("|||") if opt] if args.predefined_options else None
 
-    result = feedback_ui(args.prompt, predefined_options, args.output_file, window_id=args.window_id)
+    questions = json.loads(args.questions) if args.questions else None
+
+    result = feedback_ui(args.prompt, predefined_options, args.output_file, window_id=args.window_id, questions=questions)
     if result:
         print(f"\nFeedback received:\n{result['interactive_feedback']}")
         if result.get('images'):
             print(f"Screenshots attached: {len(result['images'])}")
     sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()